@@ -1,10 +1,23 @@
 import sys
+import functools
 from typing import Any, List, Tuple, Union
 
 
 GITHUB_ISSUE = "https://github.com/inlab-geo/cofi/issues"
 
 
+def _cached_str(str_func):
+    """Renders an error message once and reuses it for later ``str()`` calls"""
+
+    @functools.wraps(str_func)
+    def wrapped_str(self):
+        if getattr(self, "_rendered_msg", None) is None:
+            self._rendered_msg = str_func(self)
+        return self._rendered_msg
+
+    return wrapped_str
+
+
 class CofiError(Exception):
     """Base class for all CoFI errors"""
 
@@ -45,6 +58,7 @@ class InvalidOptionError(CofiError, ValueError):
         self._invalid_option = invalid_option
         self._valid_options = valid_options
 
+    @_cached_str
     def __str__(self) -> str:
         super_msg = super().__str__()
         msg = (
@@ -90,6 +104,7 @@ class DimensionMismatchError(CofiError, ValueError):
         self._expected_dimension = expected_dimension
         self._expected_source = expected_source
 
+    @_cached_str
     def __str__(self) -> str:
         super_msg = super().__str__()
         msg = (
@@ -120,6 +135,7 @@ class NotDefinedError(CofiError, NotImplementedError):
         super().__init__(*args, **kwargs)
         self._needs = needs
 
+    @_cached_str
     def __str__(self) -> str:
         super_msg = super().__str__()
         msg = (
@@ -152,6 +168,7 @@ class InvocationError(CofiError, RuntimeError):
         self._func_name = func_name
         self._func_name_prefix = "auto-generated" if autogen else "your"
 
+    @_cached_str
     def __str__(self) -> str:
         super_msg = super().__str__()
         msg = (
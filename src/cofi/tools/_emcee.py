@@ -1,9 +1,26 @@
 import functools
+from operator import itemgetter
 import numpy as np
 
 from . import BaseInferenceTool, error_handler
 
 
+_RUN_MCMC_ARGS = (
+    "initial_state",
+    "nsteps",
+    "log_prob0",
+    "rstate0",
+    "blobs0",
+    "tune",
+    "skip_initial_state_check",
+    "thin_by",
+    "thin",
+    "store",
+    "progress",
+    "progress_kwargs",
+)
+
+
 class Emcee(BaseInferenceTool):
     documentation_links = [
         "https://emcee.readthedocs.io/en/stable/user/sampler/#emcee.EnsembleSampler",
@@ -59,16 +76,15 @@ class Emcee(BaseInferenceTool):
         if inv_problem.log_posterior_with_blobs_defined:
             self._params["log_prob_fn"] = inv_problem.log_posterior_with_blobs
             if inv_problem.blobs_dtype_defined:
-                self._params["blob_names"] = [
-                    name for (name, _) in inv_problem.blobs_dtype
-                ]
+                self._params["blob_names"] = list(
+                    map(itemgetter(0), inv_problem.blobs_dtype)
+                )
                 # uncomment below once this has been fixed:
                 # issue: https://github.com/arviz-devs/arviz/issues/2036
                 # self._blobs_dtype = inv_problem._blobs_dtype
         else:
             self._params["log_prob_fn"] = inv_problem.log_posterior
-        self._params["ndim"] = np.shape(self._params["initial_state"])[0]
-        self._params["ndim"] = np.prod(inv_problem.model_shape)
+        self._params["ndim"] = int(np.prod(inv_problem.model_shape))
 
     @error_handler(
         when="in creating emcee.EnsembleSampler object",
@@ -82,7 +98,7 @@ class Emcee(BaseInferenceTool):
             ndim=self._params["ndim"],
             log_prob_fn=self._params["log_prob_fn"],
             pool=self._params["pool"],
-            moves=self._params["moves"],
+            moves=self._resolve_moves(),
             args=None,  # already handled by BaseProblem
             kwargs=None,  # already handled by BaseProblem
             backend=self._params["backend"],
@@ -96,26 +112,36 @@ class Emcee(BaseInferenceTool):
             runtime_sortingfn=self._params["runtime_sortingfn"],
         )
 
+    def _resolve_moves(self):
+        # moves="auto": differential evolution moves for higher dimensional models,
+        # emcee's default stretch move otherwise
+        moves = self._params["moves"]
+        if not (isinstance(moves, str) and moves == "auto"):
+            return moves
+        if self._params["ndim"] <= 10:
+            return None
+        from emcee.moves import DEMove, DESnookerMove
+
+        return [(DEMove(), 0.8), (DESnookerMove(), 0.2)]
+
     @error_handler(
         when="when running sampling",
         context="in the process of sampling",
     )
     def _run_mcmc(self):
-        self.sampler.reset()
-        self.sampler.run_mcmc(
-            initial_state=self._params["initial_state"],
-            nsteps=self._params["nsteps"],
-            log_prob0=self._params["log_prob0"],
-            rstate0=self._params["rstate0"],
-            blobs0=self._params["blobs0"],
-            tune=self._params["tune"],
-            skip_initial_state_check=self._params["skip_initial_state_check"],
-            thin_by=self._params["thin_by"],
-            thin=self._params["thin"],
-            store=self._params["store"],
-            progress=self._params["progress"],
-            progress_kwargs=self._params["progress_kwargs"],
-        )
+        # read from self._params at each run, so that later changes are picked up
+        run_mcmc_kwargs = {k: self._params[k] for k in _RUN_MCMC_ARGS}
+        if self._params["reset_before_run"]:
+            self.sampler.reset()
+        elif self.sampler.iteration > 0:  # continue from where the last run stopped
+            run_mcmc_kwargs = dict(
+                run_mcmc_kwargs,
+                initial_state=None,
+                log_prob0=None,
+                rstate0=None,
+                blobs0=None,
+            )
+        self.sampler.run_mcmc(**run_mcmc_kwargs)
 
 
 @functools.lru_cache(maxsize=None)
@@ -142,6 +168,7 @@ def _init_class_methods():
             if k not in {"iterations", "self"}
         }
     )
+    optional_in_options["reset_before_run"] = True
     return (
         required_in_problem,
         optional_in_problem,
@@ -1,6 +1,7 @@
 from abc import abstractmethod, ABCMeta
 from numbers import Number
 from functools import reduce
+from operator import mul
 import numpy as np
 
 from .._exceptions import DimensionMismatchError
@@ -21,8 +22,18 @@ class BaseRegularization(metaclass=ABCMeta):
         BaseRegularization.reg
         BaseRegularization.gradient
         BaseRegularization.hessian
+        BaseRegularization.hessian_times_vector
         BaseRegularization.__call__
 
+    .. rubric:: Evaluating a batch of models
+
+    Several models (e.g. all walkers of an ensemble sampler) can be evaluated in one
+    call:
+
+    .. autosummary::
+        BaseRegularization.reg_batch
+        BaseRegularization.gradient_batch
+
     .. rubric:: Adding two terms
 
     Two instances of ``BaseRegularization`` can also be added together using the ``+``
@@ -47,7 +58,7 @@ class BaseRegularization(metaclass=ABCMeta):
     @property
     def model_size(self) -> Number:
         """the number of unknowns that current regularization function accepts"""
-        return reduce(lambda a, b: a * b, np.array(self.model_shape), 1)
+        return reduce(mul, self.model_shape, 1)
 
     def __call__(self, model: np.ndarray) -> Number:
         r"""a class instance itself can also be called as a function
@@ -85,6 +96,39 @@ class BaseRegularization(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    def hessian_times_vector(self, model: np.ndarray, vector: np.ndarray) -> np.ndarray:
+        """the hessian of regularization function (given a model) multiplied by a
+        vector
+
+        This is useful for matrix-free solvers (e.g. Newton-CG) that only need the
+        action of the Hessian. By default it forms :meth:`hessian` and multiplies;
+        subclasses can override it to avoid building the :math:`(M,M)` matrix.
+        """
+        return np.asarray(self.hessian(model) @ np.ravel(vector)).ravel()
+
+    def reg_batch(self, models: np.ndarray) -> np.ndarray:
+        r"""the regularization function values given a batch of models to evaluate
+
+        The first axis of ``models`` indexes the models, so a batch has shape
+        :math:`(B,M)` (or :math:`(B,)` followed by :attr:`model_shape`), and the
+        result has shape :math:`(B,)`.
+
+        By default this calls :meth:`reg` on each model in turn. Subclasses can
+        override it with a vectorized implementation.
+        """
+        return np.array([self.reg(model) for model in models])
+
+    def gradient_batch(self, models: np.ndarray) -> np.ndarray:
+        r"""the gradients of regularization function given a batch of models
+
+        Models in ``models`` are laid out as in :meth:`reg_batch`, and the result has
+        shape :math:`(B,M)`.
+
+        By default this calls :meth:`gradient` on each model in turn. Subclasses can
+        override it with a vectorized implementation.
+        """
+        return np.array([self.gradient(model) for model in models])
+
     def __add__(self, other_reg):
         r"""Adds two regularization terms
 
@@ -127,12 +171,17 @@ class BaseRegularization(metaclass=ABCMeta):
                 f"unsupported operand type(s) for +: '{self.__class__.__name__}' "
                 f"and '{other_reg.__class__.__name__}"
             )
-        if self.model_size != other_reg.model_size:
+        # compare shapes first, and only fall back to comparing sizes for terms
+        # that accept the same flattened model in different shapes
+        if (
+            self.model_shape != other_reg.model_shape
+            and self.model_size != other_reg.model_size
+        ):
             raise DimensionMismatchError(
                 entered_name="the second regularization term",
-                entered_dimension=other_reg.model_size,
+                entered_dimension=other_reg.model_shape,
                 expected_source="the first regularization term",
-                expected_dimension=self.model_size,
+                expected_dimension=self.model_shape,
             )
 
         return CompositeRegularization(self, other=other_reg)
@@ -174,33 +223,100 @@ class BaseRegularization(metaclass=ABCMeta):
                 f"unsupported operand type(s) for *: '{coefficient.__class__.__name__}'"
                 f" and '{self.__class__.__name__}"
             )
+        if coefficient == 1:
+            return self
         return CompositeRegularization(self, coefficient=coefficient)
 
+    def _validate_models(self, models, dtype=None):
+        # a batch laid out as in reg_batch, flattened to (B,M) for vectorized
+        # overrides of reg_batch / gradient_batch
+        models = np.asarray(models, dtype=dtype)
+        if models.ndim == 0 or reduce(mul, models.shape[1:], 1) != self.model_size:
+            raise DimensionMismatchError(
+                entered_name="models",
+                entered_dimension=models.shape,
+                expected_source="model_size",
+                expected_dimension=self.model_size,
+            )
+        return np.reshape(models, (-1, self.model_size))
+
 
 class CompositeRegularization(BaseRegularization):
     def __init__(self, base, other=None, coefficient=None):
         self.base = base
         self.other = other
         self.coefficient = coefficient
+        # flatten nested sums / scalings into a single list of (coefficient, term)
+        # so that each evaluation visits every leaf term exactly once
+        if other is not None:
+            self._terms = _terms_of(base) + _terms_of(other)
+        elif coefficient == 0:  # nothing left to evaluate
+            self._terms = []
+        elif coefficient is not None:
+            self._terms = [(coefficient * c, reg) for c, reg in _terms_of(base)]
+        else:
+            self._terms = _terms_of(base)
 
     @property
     def model_shape(self):
         return self.base.model_shape
 
     def reg(self, model):
-        if self.other:
-            return self.base.reg(model) + self.other.reg(model)
-        elif self.coefficient is not None:
-            return self.coefficient * self.base.reg(model)
+        return sum(c * reg.reg(model) for c, reg in self._terms)
 
     def gradient(self, model):
-        if self.other:
-            return self.base.gradient(model) + self.other.gradient(model)
-        elif self.coefficient is not None:
-            return self.coefficient * self.base.gradient(model)
+        grad = self._sum_terms(lambda reg: reg.gradient(model))
+        return np.zeros(self.model_size) if grad is None else grad
+
+    def reg_batch(self, models):
+        res = self._sum_terms(lambda reg: reg.reg_batch(models))
+        return np.zeros(len(models)) if res is None else res
+
+    def gradient_batch(self, models):
+        grads = self._sum_terms(lambda reg: reg.gradient_batch(models))
+        return np.zeros((len(models), self.model_size)) if grads is None else grads
+
+    def hessian_times_vector(self, model, vector):
+        res = self._sum_terms(lambda reg: reg.hessian_times_vector(model, vector))
+        return np.zeros(self.model_size) if res is None else res
 
     def hessian(self, model):
-        if self.other:
-            return self.base.hessian(model) + self.other.hessian(model)
-        elif self.coefficient is not None:
-            return self.coefficient * self.base.hessian(model)
+        hess = self._sum_terms(lambda reg: reg.hessian(model))
+        if hess is None:
+            return np.zeros((self.model_size, self.model_size))
+        return hess
+
+    def _sum_terms(self, evaluate):
+        # sum of c * evaluate(term), or None if there are no terms; the first
+        # term's result is kept as is (so its shape and dtype are preserved), and
+        # later ones are only added in place into a temporary we own
+        total = None
+        owned = False  # whether total is a temporary that is safe to update in place
+        for c, reg in self._terms:
+            value = evaluate(reg)
+            if c != 1:
+                value = c * value
+            if total is None:
+                total, owned = value, c != 1
+            elif owned and _can_add_inplace(total, value):
+                np.add(total, value, out=total)
+            else:
+                total, owned = total + value, True
+        return total
+
+
+def _terms_of(reg):
+    if isinstance(reg, CompositeRegularization):
+        return list(reg._terms)
+    return [(1, reg)]
+
+
+def _can_add_inplace(out, other):
+    # only plain dense arrays are accumulated in place; sparse matrices (and sums
+    # that would need upcasting or broadcasting) go through "+"
+    return (
+        type(out) is np.ndarray
+        and type(other) is np.ndarray
+        and out.shape == other.shape
+        and np.can_cast(other.dtype, out.dtype)
+    )
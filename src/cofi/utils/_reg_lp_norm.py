@@ -14,6 +14,11 @@ REG_TYPES = {
     "smoothing": 2,
 }
 
+# floating point types that scipy.sparse can hold (notably not float16)
+SPARSE_FLOAT_DTYPES = tuple(
+    np.dtype(t) for t in (np.float32, np.float64, np.longdouble)
+)
+
 
 class LpNormRegularization(BaseRegularization):
     r"""CoFI's utility class to calculate Lp-norm regularization, given the p value
@@ -94,6 +99,11 @@ class LpNormRegularization(BaseRegularization):
         given
     reference_model: np.ndarray
         :math:`m_0` in the formula above
+    dtype: np.dtype
+        floating point type that the weighting matrix and models are evaluated in,
+        one of :code:`np.float32`, :code:`np.float64` or :code:`np.longdouble`,
+        default to :code:`np.float64`; :code:`np.float32` halves the memory traffic
+        for large models at the cost of precision
 
     Raises
     ------
@@ -125,38 +135,103 @@ class LpNormRegularization(BaseRegularization):
         weighting_matrix: Union[str, np.ndarray] = "damping",
         model_shape: tuple = None,
         reference_model: np.ndarray = None,
+        dtype: np.dtype = np.float64,
     ):
         self._order = self._validate_p(p)
+        self._dtype = self._validate_dtype(dtype)
         self._weighting_matrix = weighting_matrix
         self._model_shape = self._validate_shape(model_shape, reference_model)
+        self._model_size = super().model_size
         self._reference_model = reference_model
+        self._flat_reference_model = (
+            None
+            if reference_model is None
+            else np.ravel(reference_model).astype(self._dtype, copy=False)
+        )
+        # damping weights by the identity, so the products with W are skipped
+        self._is_identity = weighting_matrix is None or (
+            isinstance(weighting_matrix, str) and weighting_matrix == "damping"
+        )
         self._generate_weighting_matrix()
+        self._weighting_matrix_t = None
+        self._last_weighted_diff = None
+        self._gram_matrix = None
+        self._gram_for_gradient = None
 
     def reg(self, model: np.ndarray) -> Number:
-        flat_m = self._validate_model(model)
-        diff_m = self._model_diff_to_ref(flat_m)
-        weighted_diff_m = self._weighting_matrix @ diff_m
+        weighted_diff_m = self._weighted_diff_to_ref(model)
         return self._lp_norm(weighted_diff_m)
 
     def gradient(self, model: np.ndarray) -> np.ndarray:
-        flat_m = self._validate_model(model)
-        diff_m = self._model_diff_to_ref(flat_m)
-        weighted_diff_m = self._weighting_matrix @ diff_m
+        if self._order == 2 and self._use_gram_for_gradient():
+            # 2 W.T W (m-m_0) as one product with the cached 2 W.T W
+            return self._weighting_gram() @ self._model_diff_to_ref(
+                self._validate_model(model)
+            )
+        weighted_diff_m = self._weighted_diff_to_ref(model)
         grad_lp_norm = self._lp_norm_gradient(weighted_diff_m)
-        return self.matrix.T @ grad_lp_norm
+        return self._times_weighting_t(grad_lp_norm)
 
     def hessian(self, model: np.ndarray) -> np.ndarray:
-        W = self._weighting_matrix
-        flat_m = self._validate_model(model)
-        diff_m = self._model_diff_to_ref(flat_m)
-        weighted_diff_m = W @ diff_m
+        if self._order == 2:  # constant 2 W.T W, independent of the model
+            self._validate_model(model)
+            if self._is_identity:
+                return np.diag(np.full(self.model_size, 2.0, dtype=self._dtype))
+            return self._weighting_gram().toarray()
+        weighted_diff_m = self._weighted_diff_to_ref(model)
         hess_lp_norm = self._lp_norm_hessian(weighted_diff_m)
-        return W.T @ np.diag(hess_lp_norm) @ W
+        if self._is_identity:
+            return np.diag(hess_lp_norm)
+        # keep the product sparse and only densify the (M,M) result
+        return self._times_weighting_t(
+            sparse.diags(hess_lp_norm) @ self._weighting_matrix
+        ).toarray()
+
+    def hessian_times_vector(self, model: np.ndarray, vector: np.ndarray) -> np.ndarray:
+        weighted_diff_m = self._weighted_diff_to_ref(model)
+        hess_lp_norm = self._lp_norm_hessian(weighted_diff_m)
+        return self._times_weighting_t(
+            hess_lp_norm * self._times_weighting(np.ravel(vector))
+        )
+
+    def reg_batch(self, models: np.ndarray) -> np.ndarray:
+        # one sparse-dense product for the whole batch instead of one per model
+        weighted_diff_ms = self._weighted_diff_to_ref_batch(models)
+        if self._order == 2:
+            return np.einsum("ij,ij->j", weighted_diff_ms, weighted_diff_ms)
+        elif self._order == 1:
+            return np.sum(np.abs(weighted_diff_ms), axis=0)
+        terms = np.abs(weighted_diff_ms)
+        np.power(terms, self._order, out=terms)
+        return np.sum(terms, axis=0)
+
+    def gradient_batch(self, models: np.ndarray) -> np.ndarray:
+        weighted_diff_ms = self._weighted_diff_to_ref_batch(models)
+        grad_lp_norms = self._lp_norm_gradient(weighted_diff_ms)
+        return np.ascontiguousarray(self._times_weighting_t(grad_lp_norms).T)
+
+    def __getstate__(self):
+        # derived caches are rebuilt lazily, so they aren't shipped when pickling
+        # (e.g. to the workers of a parallel InversionPool)
+        state = self.__dict__.copy()
+        state.update(
+            _weighting_matrix_t=None,
+            _last_weighted_diff=None,
+            _gram_matrix=None,
+            _gram_for_gradient=None,
+        )
+        if self._is_identity:
+            state["_weighting_matrix"] = None
+        return state
 
     @property
     def model_shape(self) -> tuple:
         return self._model_shape
 
+    @property
+    def model_size(self) -> int:
+        return self._model_size
+
     @property
     def matrix(self) -> sparse.csr_matrix:
         """the regularization matrix
@@ -165,19 +240,23 @@ class LpNormRegularization(BaseRegularization):
         (generated by Python package ``findiff``), or a custom matrix brought on your
         own.
         """
+        if self._weighting_matrix is None:  # damping, only built when asked for
+            self._weighting_matrix = sparse.identity(
+                self.model_size, dtype=self._dtype, format="csr"
+            )
         return self._weighting_matrix
 
     def _generate_weighting_matrix(self):
-        import findiff
-
         if (
             isinstance(self._weighting_matrix, str)
             and self._weighting_matrix in REG_TYPES
         ) or self._weighting_matrix is None:
             _reg_type = self._weighting_matrix
             if _reg_type == "damping" or _reg_type is None:  # 0th order difference
-                self._weighting_matrix = sparse.identity(self.model_size, format="csr")
+                self._weighting_matrix = None  # identity, see the matrix property
             elif _reg_type in REG_TYPES:  # 1st/2nd order difference
+                import findiff
+
                 if np.size(self.model_shape) == 1:  # 1D model
                     order = REG_TYPES[_reg_type]
                     if self.model_size < order + 2:
@@ -202,8 +281,8 @@ class LpNormRegularization(BaseRegularization):
                     d_dy = findiff.FinDiff(1, 1, order)  # y direction
                     matx = d_dx.matrix((nx, ny))  # scipy sparse matrix
                     maty = d_dy.matrix((nx, ny))  # scipy sparse matrix
-                    self._weighting_matrix = np.vstack(
-                        (matx.toarray(), maty.toarray())
+                    self._weighting_matrix = sparse.vstack(
+                        (matx, maty), format="csr"
                     )  # combine above
                 else:
                     raise NotImplementedError(
@@ -225,6 +304,8 @@ class LpNormRegularization(BaseRegularization):
                 "please specify the weighting matrix either via a string among "
                 "\{`damping`, `flattening`, `smoothing`\}, or bringing your own matrix"
             )
+        if self._weighting_matrix is not None:
+            self._weighting_matrix = _finalize_csr(self._weighting_matrix, self._dtype)
 
     @staticmethod
     def _validate_p(p):
@@ -236,6 +317,17 @@ class LpNormRegularization(BaseRegularization):
             raise ValueError(f"positive number expected for argument `p` but got {p}")
         return p
 
+    @staticmethod
+    def _validate_dtype(dtype):
+        dtype = np.dtype(dtype)
+        if dtype not in SPARSE_FLOAT_DTYPES:
+            raise ValueError(
+                "floating point type supported by scipy.sparse (one of "
+                f"{', '.join(str(t) for t in SPARSE_FLOAT_DTYPES)}) expected for "
+                f"argument `dtype` but got {dtype}"
+            )
+        return dtype
+
     @staticmethod
     def _validate_shape(model_shape, reference_model):
         if model_shape is None and reference_model is None:
@@ -262,8 +354,49 @@ class LpNormRegularization(BaseRegularization):
                     )
             return model_shape
 
+    def _weighting_gram(self):
+        # 2 W.T @ W (the p=2 hessian), built on first use with the factor of two
+        # folded in and kept with sorted indices for fast products
+        if self._gram_matrix is None:
+            self._gram_matrix = self._build_gram()
+        return self._gram_matrix
+
+    def _build_gram(self):
+        gram = (self.matrix.T @ self.matrix).tocsr()
+        gram.data *= 2
+        gram.sort_indices()
+        return gram
+
+    def _use_gram_for_gradient(self):
+        # one product with W.T W instead of two with W and W.T, when it's no denser.
+        # The squared row counts of W bound nnz(W.T W), so matrices whose Gram
+        # matrix could be much denser than W (e.g. short and wide ones) are ruled
+        # out without forming it; otherwise it's formed at O(nnz(W)) cost, and only
+        # kept if it's actually used
+        if self._gram_for_gradient is None:
+            self._gram_for_gradient = False
+            if not self._is_identity:
+                w_nnz = self._weighting_matrix.nnz
+                row_nnz = np.diff(self._weighting_matrix.indptr)
+                if np.square(row_nnz).sum() <= 4 * w_nnz:
+                    gram = self._gram_matrix
+                    if gram is None:
+                        gram = self._build_gram()
+                    if gram.nnz <= 2 * w_nnz:
+                        self._gram_matrix = gram
+                        self._gram_for_gradient = True
+        return self._gram_for_gradient
+
     def _validate_model(self, model):
-        flat_m = np.ravel(model)
+        if (
+            isinstance(model, np.ndarray)
+            and model.ndim == 1
+            and model.dtype == self._dtype
+            and model.flags.c_contiguous
+            and model.size == self.model_size
+        ):  # already in the layout the sparse products expect
+            return model
+        flat_m = np.ravel(model).astype(self._dtype, copy=False)
         if flat_m.size != self.model_size:
             raise DimensionMismatchError(
                 entered_name="model",
@@ -273,20 +406,71 @@ class LpNormRegularization(BaseRegularization):
             )
         return flat_m
 
+    def _weighted_diff_to_ref(self, model):
+        # W(m-m_0), reusing the last result when reg / gradient / hessian are
+        # evaluated one after another at the same model
+        flat_m = self._validate_model(model)
+        if self._is_identity:  # m-m_0 is cheap enough not to cache
+            return self._model_diff_to_ref(flat_m)
+        last = self._last_weighted_diff
+        if last is not None and np.array_equal(last[0], flat_m):
+            return last[1]
+        weighted_diff_m = self._weighting_matrix @ self._model_diff_to_ref(flat_m)
+        self._last_weighted_diff = (flat_m.copy(), weighted_diff_m)
+        return weighted_diff_m
+
+    def _weighted_diff_to_ref_batch(self, models):
+        # W(m-m_0) for each model, stacked as columns of an (N,B) array
+        flat_ms = self._validate_models(models, dtype=self._dtype)
+        return self._times_weighting(self._model_diff_to_ref(flat_ms).T)
+
+    def _times_weighting(self, x):
+        return x if self._is_identity else self._weighting_matrix @ x
+
+    def _times_weighting_t(self, x):
+        if self._is_identity:
+            return x
+        if self._weighting_matrix_t is None:
+            # transposed copy in CSR, built on first use, so that W.T @ x is a
+            # row-wise sparse product too
+            self._weighting_matrix_t = self._weighting_matrix.T.tocsr()
+        return self._weighting_matrix_t @ x
+
     def _model_diff_to_ref(self, model):
-        if self._reference_model is None:
+        if self._flat_reference_model is None:
             return model
         else:
-            return model - np.ravel(self._reference_model)
+            return model - self._flat_reference_model
 
+    # p=2 and p=1 are special-cased to skip the abs / power / sign passes
     def _lp_norm(self, mat):
-        return np.sum(np.abs(mat) ** self._order)
+        if self._order == 2:
+            return mat @ mat
+        elif self._order == 1:
+            return np.sum(np.abs(mat))
+        terms = np.abs(mat)
+        np.power(terms, self._order, out=terms)
+        return np.sum(terms)
 
     def _lp_norm_gradient(self, mat):
-        return self._order * np.abs(mat) ** (self._order - 1) * np.sign(mat)
+        if self._order == 2:
+            return 2 * mat
+        elif self._order == 1:
+            return np.sign(mat)
+        # p * |x|^(p-1) * sign(x), accumulated in place in a single buffer; sign
+        # rather than copysign, so that x=0 still gives 0 for p>1 (and nan for p<1)
+        grad = np.abs(mat)
+        np.power(grad, self._order - 1, out=grad)
+        grad *= np.sign(mat)
+        grad *= self._order
+        return grad
 
     def _lp_norm_hessian(self, mat):
         p = self._order
+        if p == 2:
+            return np.full(np.shape(mat), 2.0, dtype=self._dtype)
+        elif p == 1:
+            return np.zeros(np.shape(mat), dtype=self._dtype)
         return p * (p - 1) * np.abs(mat) ** (p - 2)
 
 
@@ -322,6 +506,11 @@ class QuadraticReg(LpNormRegularization):
         given
     reference_model: np.ndarray
         :math:`m_0` in the formula above
+    dtype: np.dtype
+        floating point type that the weighting matrix and models are evaluated in,
+        one of :code:`np.float32`, :code:`np.float64` or :code:`np.longdouble`,
+        default to :code:`np.float64`; :code:`np.float32` halves the memory traffic
+        for large models at the cost of precision
 
     Raises
     ------
@@ -353,19 +542,35 @@ class QuadraticReg(LpNormRegularization):
         weighting_matrix: Union[str, np.ndarray] = "damping",
         model_shape: tuple = None,
         reference_model: np.ndarray = None,
+        dtype: np.dtype = np.float64,
     ):
         super().__init__(
             p=2,
             weighting_matrix=weighting_matrix,
             model_shape=model_shape,
             reference_model=reference_model,
+            dtype=dtype,
         )
 
 
-matrix_like_classes = [np.ndarray] + [
-    getattr(sparse, name) for name in sparse.__all__ if name.endswith("_matrix")
-]
+def _finalize_csr(mat, dtype):
+    # canonical CSR (sorted, no duplicate entries, data in the evaluation dtype)
+    # so that products with W take SciPy's straightforward path on every call
+    mat = mat.tocsr()
+    if not mat.has_canonical_format:
+        # copy first, as a bring-your-own CSR matrix shares its buffers with ours
+        mat = mat.copy()
+        mat.sum_duplicates()  # also sorts the indices
+    if mat.dtype != dtype and np.can_cast(mat.dtype, dtype, casting="same_kind"):
+        mat = mat.astype(dtype)
+    return mat
+
+
+# spmatrix is the base of all *_matrix formats; sparray only exists in newer SciPy
+matrix_like_classes = (np.ndarray, sparse.spmatrix) + (
+    (sparse.sparray,) if hasattr(sparse, "sparray") else ()
+)
 
 
 def is_matrix_like(obj):
-    return any(isinstance(obj, cls) for cls in matrix_like_classes)
+    return isinstance(obj, matrix_like_classes)
@@ -81,7 +81,7 @@ class GaussianPrior(ModelCovariance):
     def reg(self, model: np.ndarray) -> Number:
         flat_m = self._validate_model(model)
         diff_m = flat_m - self._mu
-        return diff_m.T @ self._Cminv @ diff_m
+        return diff_m @ (self._Cminv @ diff_m)
 
     def gradient(self, model: np.ndarray) -> np.ndarray:
         flat_m = self._validate_model(model)
@@ -90,6 +90,18 @@ class GaussianPrior(ModelCovariance):
     def hessian(self, model: np.ndarray) -> np.ndarray:
         return 2 * self._Cminv
 
+    def hessian_times_vector(self, model: np.ndarray, vector: np.ndarray) -> np.ndarray:
+        return 2 * (self._Cminv @ np.ravel(vector))
+
+    def reg_batch(self, models: np.ndarray) -> np.ndarray:
+        # one matrix-matrix product with Cm^{-1} for the whole batch
+        diff_ms = self._validate_models(models) - self._mu
+        return np.einsum("ij,ij->i", diff_ms, (self._Cminv @ diff_ms.T).T)
+
+    def gradient_batch(self, models: np.ndarray) -> np.ndarray:
+        diff_ms = self._validate_models(models) - self._mu
+        return np.ascontiguousarray(2 * (self._Cminv @ diff_ms.T).T)
+
     @property
     def model_shape(self) -> tuple:
         return self._model_shape
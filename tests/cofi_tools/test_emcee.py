@@ -178,3 +178,101 @@ def test_runtime_cofi_error():
     inv_problem.set_model_shape(ndim)
     with pytest.raises(CofiError) as e:
         inv_problem.log_posterior("1")
+
+
+def test_run_vectorized_posterior():
+    # set up problem with a log posterior that evaluates a batch of walkers at once
+    batch_shapes = []
+
+    def batch_log_posterior(models):
+        batch_shapes.append(np.shape(models))
+        return np.array([log_posterior(m) for m in models])
+
+    inv_problem = BaseProblem()
+    inv_problem.set_log_posterior(batch_log_posterior)
+    inv_problem.set_model_shape(ndim)
+    # set up options
+    inv_options = InversionOptions()
+    inv_options.set_tool("emcee")
+    inv_options.set_params(
+        nwalkers=nwalkers, nsteps=50, initial_state=walkers_start, vectorize=True
+    )
+    # define solver
+    emcee_solver = Emcee(inv_problem, inv_options)
+    res = emcee_solver()
+    assert res["sampler"].get_chain().shape == (50, nwalkers, ndim)
+    assert all(len(shape) == 2 and shape[1] == ndim for shape in batch_shapes)
+
+
+def test_auto_moves():
+    from emcee.moves import DEMove, DESnookerMove
+
+    def _seeded_chain(inv_problem, model_size, moves):
+        inv_options = InversionOptions()
+        inv_options.set_tool("emcee")
+        np.random.seed(42)
+        inv_options.set_params(
+            nwalkers=nwalkers,
+            nsteps=10,
+            initial_state=np.random.randn(nwalkers, model_size),
+            moves=moves,
+        )
+        return Emcee(inv_problem, inv_options)()["sampler"].get_chain()
+
+    # low dimensional model keeps emcee's default stretch move
+    inv_problem = BaseProblem()
+    inv_problem.set_log_posterior(log_posterior)
+    inv_problem.set_model_shape(ndim)
+    assert np.array_equal(
+        _seeded_chain(inv_problem, ndim, "auto"),
+        _seeded_chain(inv_problem, ndim, None),
+    )
+    # higher dimensional model switches to differential evolution moves
+    inv_problem = BaseProblem()
+    inv_problem.set_log_posterior(lambda m: -0.5 * m @ m)
+    inv_problem.set_model_shape((12,))
+    auto_chain = _seeded_chain(inv_problem, 12, "auto")
+    assert np.array_equal(
+        auto_chain,
+        _seeded_chain(inv_problem, 12, [(DEMove(), 0.8), (DESnookerMove(), 0.2)]),
+    )
+    assert not np.array_equal(auto_chain, _seeded_chain(inv_problem, 12, None))
+
+
+def test_continue_without_reset():
+    inv_problem = BaseProblem()
+    inv_problem.set_log_posterior(log_posterior)
+    inv_problem.set_model_shape(ndim)
+    inv_options = InversionOptions()
+    inv_options.set_tool("emcee")
+    inv_options.set_params(
+        nwalkers=nwalkers, nsteps=20, initial_state=walkers_start
+    )
+    # default: every run starts afresh
+    emcee_solver = Emcee(inv_problem, inv_options)
+    emcee_solver()
+    res = emcee_solver()
+    assert res["sampler"].get_chain().shape == (20, nwalkers, ndim)
+    # reset_before_run=False: the second run continues the first chain
+    inv_options.set_params(
+        nwalkers=nwalkers, nsteps=20, initial_state=walkers_start, reset_before_run=False
+    )
+    emcee_solver = Emcee(inv_problem, inv_options)
+    first_chain = emcee_solver()["sampler"].get_chain().copy()
+    res = emcee_solver()
+    chain = res["sampler"].get_chain()
+    assert chain.shape == (40, nwalkers, ndim)
+    assert np.array_equal(chain[:20], first_chain)
+
+
+def test_params_changed_after_construction():
+    inv_problem = BaseProblem()
+    inv_problem.set_log_posterior(log_posterior)
+    inv_problem.set_model_shape(ndim)
+    inv_options = InversionOptions()
+    inv_options.set_tool("emcee")
+    inv_options.set_params(nwalkers=nwalkers, nsteps=10, initial_state=walkers_start)
+    emcee_solver = Emcee(inv_problem, inv_options)
+    emcee_solver._params["nsteps"] = 15
+    res = emcee_solver()
+    assert res["sampler"].get_chain().shape == (15, nwalkers, ndim)
@@ -61,3 +61,104 @@ def test_mul_reg_with_constant():
     assert np.array_equal(new_reg.gradient(test_model), 10 * reg.gradient(test_model))
     assert np.array_equal(new_reg.hessian(test_model), 10 * reg.hessian(test_model))
     assert reg.model_shape == new_reg.model_shape
+
+def test_nested_composite_reg():
+    reg1 = QuadraticReg(model_shape=(4,), weighting_matrix="damping")
+    reg2 = QuadraticReg(model_shape=(4,), weighting_matrix="flattening")
+    reg3 = QuadraticReg(model_shape=(4,), weighting_matrix="smoothing")
+    composite = 2 * (reg1 + 3 * reg2) + reg3
+    test_model = np.array([1,2,3,5])
+    expected_reg = 2 * reg1(test_model) + 6 * reg2(test_model) + reg3(test_model)
+    expected_grad = 2 * reg1.gradient(test_model) + 6 * reg2.gradient(test_model) + reg3.gradient(test_model)
+    expected_hess = 2 * reg1.hessian(test_model) + 6 * reg2.hessian(test_model) + reg3.hessian(test_model)
+    assert composite(test_model) == pytest.approx(expected_reg)
+    assert np.allclose(composite.gradient(test_model), expected_grad)
+    assert np.allclose(composite.hessian(test_model), expected_hess)
+
+def test_mul_reg_with_zero_or_one():
+    reg = QuadraticReg(model_shape=(3,), weighting_matrix="flattening")
+    assert 1 * reg is reg
+    zero_reg = 0 * reg
+    test_model = np.array([1,2,3])
+    assert zero_reg(test_model) == 0
+    assert np.array_equal(zero_reg.gradient(test_model), np.zeros(3))
+    assert np.array_equal(zero_reg.hessian(test_model), np.zeros((3,3)))
+    sum_reg = zero_reg + reg
+    assert sum_reg(test_model) == reg(test_model)
+    assert np.array_equal(sum_reg.gradient(test_model), reg.gradient(test_model))
+
+def test_batch_regs():
+    reg1 = QuadraticReg(model_shape=(4,), weighting_matrix="damping")
+    reg2 = QuadraticReg(model_shape=(4,), weighting_matrix="smoothing")
+    composite = reg1 + 2 * reg2
+    test_models = np.array([[1,2,3,5],[0,0,0,0],[1,-1,1,-1]])
+    assert composite.reg_batch(test_models).shape == (3,)
+    assert np.allclose(
+        composite.reg_batch(test_models), [composite(m) for m in test_models]
+    )
+    assert composite.gradient_batch(test_models).shape == (3,4)
+    assert np.allclose(
+        composite.gradient_batch(test_models),
+        [composite.gradient(m) for m in test_models],
+    )
+    assert np.array_equal(reg1.reg_batch(test_models), [reg1(m) for m in test_models])
+
+def test_hessian_times_vector():
+    reg1 = QuadraticReg(model_shape=(4,), weighting_matrix="damping")
+    reg2 = QuadraticReg(model_shape=(4,), weighting_matrix="smoothing")
+    composite = reg1 + 2 * reg2
+    test_model = np.array([1,2,3,5])
+    test_vector = np.array([0.5,-1,2,0])
+    for reg in [reg1, reg2, composite]:
+        assert np.allclose(
+            reg.hessian_times_vector(test_model, test_vector),
+            reg.hessian(test_model) @ test_vector,
+        )
+
+def test_composite_keeps_term_gradient_shape():
+    class shaped_reg(BaseRegularization):
+        @property
+        def model_shape(self):
+            return (2,2)
+        def reg(self, model):
+            return np.sum(model**2)
+        def gradient(self, model):
+            return 2 * np.reshape(model, (2,2))
+        def hessian(self, model):
+            return 2 * np.identity(4)
+    test_model = np.array([[1.,2],[3,4]])
+    assert np.array_equal((2 * shaped_reg()).gradient(test_model), 4 * test_model)
+    summed = shaped_reg() + shaped_reg()
+    assert np.array_equal(summed.gradient(test_model), 4 * test_model)
+    reg32 = QuadraticReg(model_shape=(3,), dtype=np.float32)
+    assert (reg32 + 2 * reg32).gradient(np.ones(3)).dtype == np.float32
+
+def test_batch_regs_empty():
+    from cofi.utils import GaussianPrior, LpNormRegularization
+    regs = [
+        QuadraticReg(model_shape=(3,)),
+        LpNormRegularization(p=1.5, weighting_matrix="flattening", model_shape=(3,)),
+        GaussianPrior(((2,),0.5), np.array([1,2,3])),
+    ]
+    for reg in regs:
+        assert reg.reg_batch(np.zeros((0, 3))).shape == (0,)
+        assert reg.gradient_batch(np.zeros((0, 3))).shape == (0, 3)
+        with pytest.raises(DimensionMismatchError):
+            reg.reg_batch(np.zeros((2, 4)))
+
+def test_hessian_times_vector_single_parameter():
+    class one_param_reg(BaseRegularization):
+        @property
+        def model_shape(self):
+            return (1,)
+        def reg(self, model):
+            return 3 * model[0] ** 2
+        def gradient(self, model):
+            return 6 * model
+        def hessian(self, model):
+            return np.array([[6.]])
+    reg = one_param_reg()
+    assert reg.hessian_times_vector(np.ones(1), np.array([2.])).shape == (1,)
+    assert np.array_equal(
+        (reg + reg).hessian_times_vector(np.ones(1), np.array([2.])), [24]
+    )
@@ -77,3 +77,21 @@ def test_mismatch_dimension():
 def test_wrong_type():
     with pytest.raises(TypeError, match=".*but got 4 of type <class 'str'>.*"):
         GaussianPrior("4", numpy.ones((3,)))
+
+def test_hessian_times_vector():
+    reg = GaussianPrior(((2,),0.5), numpy.array([1,2,3]))
+    test_vector = numpy.array([1,-1,2])
+    assert numpy.allclose(
+        reg.hessian_times_vector(numpy.zeros(3), test_vector),
+        reg.hessian(numpy.zeros(3)) @ test_vector,
+    )
+
+def test_batch_gaussian_prior():
+    reg = GaussianPrior(((2,),0.5), numpy.array([1,2,3]))
+    models = numpy.array([[1,-1,2], [0,0.5,3], [4,2,1]])
+    assert numpy.allclose(reg.reg_batch(models), [reg(m) for m in models])
+    assert numpy.allclose(
+        reg.gradient_batch(models), [reg.gradient(m) for m in models]
+    )
+    with pytest.raises(DimensionMismatchError):
+        reg.reg_batch(numpy.zeros((2, 4)))
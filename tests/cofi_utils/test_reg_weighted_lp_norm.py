@@ -1,3 +1,6 @@
+import pickle
+import tracemalloc
+
 import pytest
 import numpy
 import scipy
@@ -223,3 +226,183 @@ def test_hessian_finite_diff():
         gradient_minus = reg.gradient(model_perturbed_minus)
         hessian_approx[:, j] = (gradient_plus - gradient_minus) / (2 * delta_m)
     numpy.testing.assert_almost_equal(hessian_actual, hessian_approx, decimal=5)
+
+def test_weighting_2d_sparse():
+    for reg_type in ["flattening", "smoothing"]:
+        reg = LpNormRegularization(model_shape=(4,5), weighting_matrix=reg_type)
+        assert _is_sparse_matrix(reg.matrix)
+        assert reg.matrix.shape == (40, 20)
+
+def test_gradient_hessian_p1_at_zero():
+    reg = LpNormRegularization(p=1, model_shape=(3,))
+    assert numpy.array_equal(reg.gradient(numpy.zeros(3)), numpy.zeros(3))
+    assert numpy.array_equal(reg.hessian(numpy.zeros(3)), numpy.zeros((3,3)))
+
+def test_gradient_general_p():
+    reg = LpNormRegularization(p=1.5, model_shape=(4,))
+    model = numpy.array([-2., -0.5, 0., 3.])
+    expected = 1.5 * numpy.abs(model) ** 0.5 * numpy.sign(model)
+    assert numpy.allclose(reg.gradient(model), expected)
+    # integer models give the same result
+    assert numpy.allclose(reg.gradient(numpy.array([-2, 0, 0, 3])), reg.gradient(numpy.array([-2., 0., 0., 3.])))
+
+def test_weighted_diff_reused():
+    reg = LpNormRegularization(p=2, weighting_matrix="smoothing", model_shape=(5,))
+    model = numpy.array([1., 3., 2., 5., 4.])
+    reg_val = reg(model)
+    grad = reg.gradient(model)
+    # same model -> cached W @ m reused, changed model -> recomputed
+    model[0] = 0.
+    fresh_reg = LpNormRegularization(p=2, weighting_matrix="smoothing", model_shape=(5,))
+    assert reg(model) == fresh_reg(model) != reg_val
+    assert numpy.allclose(reg.gradient(model), fresh_reg.gradient(model))
+    assert not numpy.allclose(reg.gradient(model), grad)
+
+def test_byo_sparse_matrix():
+    mat = sparse.coo_matrix(numpy.array([[1,-1,0],[0,1,-1]]))
+    reg = LpNormRegularization(weighting_matrix=mat, model_shape=(3,))
+    assert _is_sparse_matrix(reg.matrix)
+    assert reg(numpy.array([1,2,4])) == 5
+    if hasattr(sparse, "csr_array"):
+        reg = LpNormRegularization(
+            weighting_matrix=sparse.csr_array(mat), model_shape=(3,)
+        )
+        assert reg(numpy.array([1,2,4])) == 5
+
+def test_hessian_p2_writable():
+    reg = LpNormRegularization(weighting_matrix="smoothing", model_shape=(6,))
+    mat = reg.matrix.toarray()
+    hess = reg.hessian(numpy.zeros(6))
+    assert isinstance(hess, numpy.ndarray)
+    assert numpy.allclose(hess, 2 * mat.T @ mat)
+    hess += 10 * numpy.eye(6)       # callers may update the result in place
+    assert numpy.allclose(reg.hessian(numpy.ones(6)), 2 * mat.T @ mat)
+
+def test_batch_lp_norms():
+    models = numpy.array([[1,2,3,5], [0,-1,2,0.5], [3,3,-2,1]])
+    ref = numpy.array([0.5,0,1,-1])
+    for p in [1, 1.5, 2]:
+        reg = LpNormRegularization(
+            p=p, weighting_matrix="flattening", reference_model=ref
+        )
+        assert numpy.allclose(reg.reg_batch(models), [reg(m) for m in models])
+        grads = reg.gradient_batch(models)
+        assert grads.shape == (3, 4)
+        assert numpy.allclose(grads, [reg.gradient(m) for m in models])
+    with pytest.raises(DimensionMismatchError):
+        reg.reg_batch(numpy.zeros((3, 5)))
+
+def test_weighting_matrix_canonical_csr():
+    mat = sparse.coo_matrix(
+        (numpy.array([1, 1, -1]), (numpy.array([0, 0, 0]), numpy.array([1, 1, 0]))),
+        shape=(1, 2),
+    )
+    reg = LpNormRegularization(weighting_matrix=mat, model_shape=(2,))
+    assert reg.matrix.format == "csr"
+    assert reg.matrix.has_canonical_format
+    assert reg.matrix.dtype == numpy.float64
+    assert reg(numpy.array([1, 2])) == 9
+
+def test_damping_skips_weighting():
+    ref = numpy.array([1,0,-1])
+    model = numpy.array([2,2,2])
+    for p in [1, 1.5, 2]:
+        reg = LpNormRegularization(p=p, reference_model=ref)
+        byo = LpNormRegularization(
+            p=p, weighting_matrix=numpy.identity(3), reference_model=ref
+        )
+        assert numpy.isclose(reg(model), byo(model))
+        assert numpy.allclose(reg.gradient(model), byo.gradient(model))
+        assert numpy.allclose(reg.hessian(model), byo.hessian(model))
+        assert numpy.allclose(
+            reg.hessian_times_vector(model, ref), byo.hessian_times_vector(model, ref)
+        )
+        assert numpy.allclose(
+            reg.gradient_batch(numpy.array([model, ref])),
+            byo.gradient_batch(numpy.array([model, ref])),
+        )
+    assert numpy.array_equal(reg.matrix.toarray(), numpy.identity(3))
+
+def test_gradient_p2_via_gram():
+    ref = numpy.array([[1,0,2],[0,1,-1],[2,2,2]])
+    model = numpy.arange(9).reshape((3,3))
+    reg = LpNormRegularization(weighting_matrix="flattening", reference_model=ref)
+    mat = reg.matrix.toarray()
+    diff = (model - ref).ravel()
+    assert numpy.allclose(reg.gradient(model), 2 * mat.T @ mat @ diff)
+    assert numpy.allclose(reg.gradient_batch(numpy.array([model])), [reg.gradient(model)])
+
+def test_dtype_float32():
+    ref = numpy.array([1,0,-1,2])
+    model = numpy.array([2.,5,1,7])
+    for p in [1.5, 2]:
+        reg = LpNormRegularization(
+            p=p, weighting_matrix="smoothing", reference_model=ref, dtype=numpy.float32
+        )
+        reg64 = LpNormRegularization(
+            p=p, weighting_matrix="smoothing", reference_model=ref
+        )
+        assert reg.matrix.dtype == numpy.float32
+        assert reg.gradient(model).dtype == numpy.float32
+        assert numpy.isclose(reg(model), reg64(model), rtol=1e-5)
+        assert numpy.allclose(reg.gradient(model), reg64.gradient(model), rtol=1e-5)
+        assert numpy.allclose(reg.hessian(model), reg64.hessian(model), rtol=1e-5)
+    for dtype in [int, numpy.float16]:
+        for weighting in ["damping", "smoothing"]:
+            with pytest.raises(ValueError, match="floating point"):
+                LpNormRegularization(
+                    weighting_matrix=weighting, model_shape=(5,), dtype=dtype
+                )
+
+def test_gradient_p2_wide_byo_memory():
+    # W.T @ W of a short, wide W would have M^2 entries (~100MB here)
+    mat = sparse.csr_matrix(numpy.ones((1, 3000)))
+    reg = LpNormRegularization(weighting_matrix=mat, model_shape=(3000,))
+    tracemalloc.start()
+    try:
+        grad = reg.gradient(numpy.ones(3000))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert numpy.allclose(grad, 6000)
+    assert peak < 10 * 1024 * 1024
+
+
+def test_pickle_round_trip():
+    model = numpy.array([1., 3, 2, 0, 5, 4])
+    for weighting in ["damping", "smoothing"]:
+        reg = LpNormRegularization(weighting_matrix=weighting, model_shape=(6,))
+        hess = reg.hessian(model)
+        grad = reg.gradient(model)
+        reg.matrix
+        reg_copy = pickle.loads(pickle.dumps(reg))
+        assert reg_copy(model) == reg(model)
+        assert numpy.allclose(reg_copy.gradient(model), grad)
+        assert numpy.array_equal(reg_copy.matrix.toarray(), reg.matrix.toarray())
+        hess_copy = reg_copy.hessian(model)
+        assert numpy.array_equal(hess_copy, hess)
+        hess_copy[0, 0] = 100
+        assert numpy.array_equal(reg_copy.hessian(model), hess)
+
+def test_byo_csr_not_modified():
+    mat = sparse.csr_matrix(
+        (numpy.array([1., 1, -1]), numpy.array([1, 1, 0]), numpy.array([0, 3])),
+        shape=(1, 2),
+    )
+    indptr, indices = mat.indptr.copy(), mat.indices.copy()
+    reg = LpNormRegularization(weighting_matrix=mat, model_shape=(2,))
+    assert reg.matrix.has_canonical_format
+    assert reg(numpy.array([1, 2])) == 9
+    assert mat.nnz == 3
+    assert numpy.array_equal(mat.indptr, indptr)
+    assert numpy.array_equal(mat.indices, indices)
+
+def test_gradient_general_p_at_zero():
+    model = numpy.array([0., -0., 2])
+    reg = LpNormRegularization(p=1.5, model_shape=(3,))
+    assert numpy.array_equal(reg.gradient(model)[:2], [0, 0])
+    reg = LpNormRegularization(p=0.5, model_shape=(3,))
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        grad = reg.gradient(model)
+    assert numpy.all(numpy.isnan(grad[:2]))
+    assert numpy.isclose(grad[2], 0.5 * 2 ** -0.5)